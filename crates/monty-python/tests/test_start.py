@@ -1,3 +1,4 @@
+import functools
 from typing import Any
 
 import pytest
@@ -6,37 +7,54 @@ from inline_snapshot import snapshot
 import pydantic_monty
 
 
+@functools.lru_cache(maxsize=64)
+def _monty(
+    code: str, script_name: str = 'main.py', external_functions: tuple[str, ...] = (), inputs: tuple[str, ...] = ()
+) -> pydantic_monty.Monty:
+    """Create a `Monty` instance, reusing it for every test that runs the same code with the same options.
+
+    `Monty.start()` doesn't modify the instance (see `test_start_can_reuse_monty_instance`), so tests
+    running the same code can share it instead of parsing and compiling it again.
+    """
+    return pydantic_monty.Monty(
+        code,
+        script_name=script_name,
+        external_functions=list(external_functions) or None,
+        inputs=list(inputs) or None,
+    )
+
+
 def test_start_no_external_functions_returns_complete():
-    m = pydantic_monty.Monty('1 + 2')
+    m = _monty('1 + 2')
     result = m.start()
     assert isinstance(result, pydantic_monty.MontyComplete)
     assert result.output == snapshot(3)
 
 
 def test_start_with_external_function_returns_progress():
-    m = pydantic_monty.Monty('func()', external_functions=['func'])
+    m = _monty('func()', external_functions=('func',))
     result = m.start()
     assert isinstance(result, pydantic_monty.MontySnapshot)
     assert result.script_name == snapshot('main.py')
-    assert result.function_name == snapshot('func')
-    assert result.args == snapshot(())
-    assert result.kwargs == snapshot({})
+    assert result.function_name == 'func'
+    assert result.args == ()
+    assert result.kwargs == {}
 
 
 def test_start_custom_script_name():
-    m = pydantic_monty.Monty('func()', script_name='custom.py', external_functions=['func'])
+    m = _monty('func()', script_name='custom.py', external_functions=('func',))
     result = m.start()
     assert isinstance(result, pydantic_monty.MontySnapshot)
     assert result.script_name == snapshot('custom.py')
 
 
 def test_start_progress_resume_returns_complete():
-    m = pydantic_monty.Monty('func()', external_functions=['func'])
+    m = _monty('func()', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
-    assert progress.function_name == snapshot('func')
-    assert progress.args == snapshot(())
-    assert progress.kwargs == snapshot({})
+    assert progress.function_name == 'func'
+    assert progress.args == ()
+    assert progress.kwargs == {}
 
     result = progress.resume(return_value=42)
     assert isinstance(result, pydantic_monty.MontyComplete)
@@ -44,34 +62,34 @@ def test_start_progress_resume_returns_complete():
 
 
 def test_start_progress_with_args():
-    m = pydantic_monty.Monty('func(1, 2, 3)', external_functions=['func'])
+    m = _monty('func(1, 2, 3)', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
-    assert progress.function_name == snapshot('func')
+    assert progress.function_name == 'func'
     assert progress.args == snapshot((1, 2, 3))
-    assert progress.kwargs == snapshot({})
+    assert progress.kwargs == {}
 
 
 def test_start_progress_with_kwargs():
-    m = pydantic_monty.Monty('func(a=1, b="two")', external_functions=['func'])
+    m = _monty('func(a=1, b="two")', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
-    assert progress.function_name == snapshot('func')
-    assert progress.args == snapshot(())
+    assert progress.function_name == 'func'
+    assert progress.args == ()
     assert progress.kwargs == snapshot({'a': 1, 'b': 'two'})
 
 
 def test_start_progress_with_mixed_args_kwargs():
-    m = pydantic_monty.Monty('func(1, 2, x="hello", y=True)', external_functions=['func'])
+    m = _monty('func(1, 2, x="hello", y=True)', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
-    assert progress.function_name == snapshot('func')
+    assert progress.function_name == 'func'
     assert progress.args == snapshot((1, 2))
     assert progress.kwargs == snapshot({'x': 'hello', 'y': True})
 
 
 def test_start_multiple_external_calls():
-    m = pydantic_monty.Monty('a() + b()', external_functions=['a', 'b'])
+    m = _monty('a() + b()', external_functions=('a', 'b'))
 
     # First call
     progress = m.start()
@@ -90,7 +108,7 @@ def test_start_multiple_external_calls():
 
 
 def test_start_chain_of_external_calls():
-    m = pydantic_monty.Monty('c() + c() + c()', external_functions=['c'])
+    m = _monty('c() + c() + c()', external_functions=('c',))
 
     call_count = 0
     progress: pydantic_monty.MontySnapshot | pydantic_monty.MontyFutureSnapshot | pydantic_monty.MontyComplete = (
@@ -109,7 +127,7 @@ def test_start_chain_of_external_calls():
 
 
 def test_start_with_inputs():
-    m = pydantic_monty.Monty('process(x)', inputs=['x'], external_functions=['process'])
+    m = _monty('process(x)', inputs=('x',), external_functions=('process',))
     progress = m.start(inputs={'x': 100})
     assert isinstance(progress, pydantic_monty.MontySnapshot)
     assert progress.function_name == snapshot('process')
@@ -117,7 +135,7 @@ def test_start_with_inputs():
 
 
 def test_start_with_limits():
-    m = pydantic_monty.Monty('1 + 2')
+    m = _monty('1 + 2')
     limits = pydantic_monty.ResourceLimits(max_allocations=1000)
     result = m.start(limits=limits)
     assert isinstance(result, pydantic_monty.MontyComplete)
@@ -130,14 +148,14 @@ def test_start_with_print_callback():
     def callback(stream: str, text: str) -> None:
         output.append((stream, text))
 
-    m = pydantic_monty.Monty('print("hello")')
+    m = _monty('print("hello")')
     result = m.start(print_callback=callback)
     assert isinstance(result, pydantic_monty.MontyComplete)
     assert output == snapshot([('stdout', 'hello'), ('stdout', '\n')])
 
 
 def test_start_resume_cannot_be_called_twice():
-    m = pydantic_monty.Monty('func()', external_functions=['func'])
+    m = _monty('func()', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -151,7 +169,7 @@ def test_start_resume_cannot_be_called_twice():
 
 
 def test_start_complex_return_value():
-    m = pydantic_monty.Monty('func()', external_functions=['func'])
+    m = _monty('func()', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -161,7 +179,7 @@ def test_start_complex_return_value():
 
 
 def test_start_resume_with_none():
-    m = pydantic_monty.Monty('func()', external_functions=['func'])
+    m = _monty('func()', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -171,7 +189,7 @@ def test_start_resume_with_none():
 
 
 def test_progress_repr():
-    m = pydantic_monty.Monty('func(1, x=2)', external_functions=['func'])
+    m = _monty('func(1, x=2)', external_functions=('func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
     assert repr(progress) == snapshot(
@@ -180,7 +198,7 @@ def test_progress_repr():
 
 
 def test_complete_repr():
-    m = pydantic_monty.Monty('42')
+    m = _monty('42')
     result = m.start()
     assert isinstance(result, pydantic_monty.MontyComplete)
     assert repr(result) == snapshot('MontyComplete(output=42)')
@@ -206,8 +224,14 @@ def test_start_can_reuse_monty_instance():
     assert result2.output == snapshot(20)
 
 
+@pytest.fixture
+def monty_instance(request: pytest.FixtureRequest) -> pydantic_monty.Monty:
+    """`Monty` instance for the code given via indirect parametrization."""
+    return _monty(request.param)
+
+
 @pytest.mark.parametrize(
-    'code,expected',
+    'monty_instance,expected',
     [
         ('1', 1),
         ('"hello"', 'hello'),
@@ -216,10 +240,10 @@ def test_start_can_reuse_monty_instance():
         ('None', None),
         ('True', True),
     ],
+    indirect=['monty_instance'],
 )
-def test_start_returns_complete_for_various_types(code: str, expected: Any):
-    m = pydantic_monty.Monty(code)
-    result = m.start()
+def test_start_returns_complete_for_various_types(monty_instance: pydantic_monty.Monty, expected: Any):
+    result = monty_instance.start()
     assert isinstance(result, pydantic_monty.MontyComplete)
     assert result.output == expected
 
@@ -233,7 +257,7 @@ except ValueError:
     caught = True
 caught
 """
-    m = pydantic_monty.Monty(code, external_functions=['external_func'])
+    m = _monty(code, external_functions=('external_func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -246,7 +270,7 @@ caught
 def test_start_progress_resume_exception_propagates_uncaught():
     """Test that uncaught exceptions from resume() propagate to caller."""
     code = 'external_func()'
-    m = pydantic_monty.Monty(code, external_functions=['external_func'])
+    m = _monty(code, external_functions=('external_func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -260,7 +284,7 @@ def test_start_progress_resume_exception_propagates_uncaught():
 
 def test_resume_none():
     code = 'external_func()'
-    m = pydantic_monty.Monty(code, external_functions=['external_func'])
+    m = _monty(code, external_functions=('external_func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
     result = progress.resume(return_value=None)
@@ -271,7 +295,7 @@ def test_resume_none():
 def test_invalid_resume_args():
     """Test that resume() with no args returns None."""
     code = 'external_func()'
-    m = pydantic_monty.Monty(code, external_functions=['external_func'])
+    m = _monty(code, external_functions=('external_func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -307,7 +331,7 @@ except ValueError:
     outer_caught = True
 (outer_caught, finally_ran)
 """
-    m = pydantic_monty.Monty(code, external_functions=['external_func'])
+    m = _monty(code, external_functions=('external_func',))
     progress = m.start()
     assert isinstance(progress, pydantic_monty.MontySnapshot)
 
@@ -0,0 +1,68 @@
+import ast
+from pathlib import Path
+
+import pytest
+import update
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(update, 'CACHE_DIR', tmp_path)
+
+
+@pytest.mark.parametrize(
+    'source,expected',
+    [
+        pytest.param(
+            '@overload\n# note\n# more\ndef anext(x): ...\ndef abs(x): ...\n',
+            [('def', 'anext', 1, 4), ('def', 'abs', 5, 5)],
+            id='comments-between-decorator-and-def',
+        ),
+        pytest.param(
+            '@a\n# c\n@b\nclass Foo: ...\nclass int: ...\n',
+            [('class', 'Foo', 1, 4), ('class', 'int', 5, 5)],
+            id='comment-between-decorators',
+        ),
+        pytest.param(
+            'x = 1\n# about foo\n@a\n# c\n@b\ndef foo(): ...\n',
+            [('def', 'foo', 2, 6)],
+            id='comments-above-and-between-decorators',
+        ),
+        pytest.param(
+            '# detached\n\n@a\ndef foo(): ...\n',
+            [('def', 'foo', 3, 4)],
+            id='comment-separated-by-blank-line',
+        ),
+        pytest.param(
+            'class Foo:\n    x: int\n    # trailing\n\n# about bar\nasync def bar(): ...\n',
+            [('class', 'Foo', 1, 3), ('def', 'bar', 5, 6)],
+            id='trailing-indented-comment',
+        ),
+    ],
+)
+def test_scan_top_level(source: str, expected: list[tuple[str, str, int, int]]):
+    assert update._scan_top_level(source.encode()) == expected
+
+
+@pytest.mark.parametrize(
+    'source,expected',
+    [
+        pytest.param(
+            '@overload\n# note\ndef anext(x): ...\n\ndef abs(x): ...\n',
+            'def abs(x): ...',
+            id='decorated-function',
+        ),
+        pytest.param(
+            '@a\n# c\n@b\nclass Foo: ...\nclass int: ...\n',
+            'class int: ...',
+            id='decorated-class',
+        ),
+        pytest.param(
+            '@overload\n# note\ndef anext(x): ...\n\ncopyright: int\n',
+            'copyright: int',
+            id='decorated-function-before-assignment',
+        ),
+    ],
+)
+def test_filter_builtins_removes_whole_definition(source: str, expected: str):
+    assert ast.dump(ast.parse(update.filter_builtins(source.encode()))) == ast.dump(ast.parse(expected))
@@ -12,87 +12,100 @@ Usage:
 """
 
 import ast
+import functools
+import hashlib
+import io
+import json
+import operator
 import shutil
 import subprocess
+import tokenize
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import cast
 
 # Whitelisted builtin functions (from crates/monty/src/builtins/)
-ALLOWED_FUNCTIONS = {
-    'abs',
-    'all',
-    'any',
-    'bin',
-    'chr',
-    'divmod',
-    'hash',
-    'hex',
-    'id',
-    'isinstance',
-    'len',
-    'max',
-    'min',
-    'oct',
-    'ord',
-    'pow',
-    'print',
-    'repr',
-    'round',
-    'sorted',
-    'sum',
-}
+ALLOWED_FUNCTIONS = frozenset(
+    {
+        'abs',
+        'all',
+        'any',
+        'bin',
+        'chr',
+        'divmod',
+        'hash',
+        'hex',
+        'id',
+        'isinstance',
+        'len',
+        'max',
+        'min',
+        'oct',
+        'ord',
+        'pow',
+        'print',
+        'repr',
+        'round',
+        'sorted',
+        'sum',
+    }
+)
 
 # Whitelisted builtin classes (from crates/monty/src/types/ and exception_private.rs)
-ALLOWED_CLASSES = {
-    # Core types
-    'object',
-    'type',
-    # Primitive types
-    'bool',
-    'int',
-    'float',
-    # String/bytes types
-    'str',
-    'bytes',
-    # Container types
-    'list',
-    'tuple',
-    'dict',
-    'set',
-    'frozenset',
-    'range',
-    # Iterator types (these are classes, not functions)
-    'enumerate',
-    'reversed',
-    'zip',
-    # Slicing
-    'slice',
-    # property is used by pathlib.Path
-    'property',
-    # Exception hierarchy (from crates/monty/src/exception_private.rs)
-    'BaseException',
-    'Exception',
-    'SystemExit',
-    'KeyboardInterrupt',
-    'ArithmeticError',
-    'OverflowError',
-    'ZeroDivisionError',
-    'LookupError',
-    'IndexError',
-    'KeyError',
-    'RuntimeError',
-    'NotImplementedError',
-    'RecursionError',
-    'AttributeError',
-    'AssertionError',
-    'MemoryError',
-    'NameError',
-    'SyntaxError',
-    'OSError',
-    'TimeoutError',
-    'TypeError',
-    'ValueError',
-    'StopIteration',
-}
+ALLOWED_CLASSES = frozenset(
+    {
+        # Core types
+        'object',
+        'type',
+        # Primitive types
+        'bool',
+        'int',
+        'float',
+        # String/bytes types
+        'str',
+        'bytes',
+        # Container types
+        'list',
+        'tuple',
+        'dict',
+        'set',
+        'frozenset',
+        'range',
+        # Iterator types (these are classes, not functions)
+        'enumerate',
+        'reversed',
+        'zip',
+        # Slicing
+        'slice',
+        # property is used by pathlib.Path
+        'property',
+        # Exception hierarchy (from crates/monty/src/exception_private.rs)
+        'BaseException',
+        'Exception',
+        'SystemExit',
+        'KeyboardInterrupt',
+        'ArithmeticError',
+        'OverflowError',
+        'ZeroDivisionError',
+        'LookupError',
+        'IndexError',
+        'KeyError',
+        'RuntimeError',
+        'NotImplementedError',
+        'RecursionError',
+        'AttributeError',
+        'AssertionError',
+        'MemoryError',
+        'NameError',
+        'SyntaxError',
+        'OSError',
+        'TimeoutError',
+        'TypeError',
+        'ValueError',
+        'StopIteration',
+    }
+)
 
 # Dependency modules that builtins.pyi imports from.
 # These are copied without filtering.
@@ -142,6 +155,8 @@ VENDOR_DIR = SCRIPT_DIR / 'vendor' / 'typeshed'
 STDLIB_DIR = VENDOR_DIR / 'stdlib'
 CUSTOM_DIR = SCRIPT_DIR / 'custom'
 TYPESHED_REPO_DIR = SCRIPT_DIR / 'typeshed-repo'
+# filtered builtins.pyi output keyed by input hash, kept outside VENDOR_DIR since that is wiped on every run
+CACHE_DIR = SCRIPT_DIR / '.cache'
 
 TYPESHED_REPO_URL = 'git@github.com:python/typeshed.git'
 
@@ -150,7 +165,8 @@ def clone_or_update_typeshed() -> tuple[Path, str]:
     """Clone or update the typeshed repository and return the path and HEAD commit hash.
 
     If the repository already exists at TYPESHED_REPO_DIR, performs a git pull.
-    Otherwise, clones the repository to that location.
+    Otherwise, clones the repository to that location, fetching and checking out
+    only builtins.pyi and the dependency files and directories.
 
     Returns:
         Tuple of (repo_path, commit_hash).
@@ -165,10 +181,23 @@ def clone_or_update_typeshed() -> tuple[Path, str]:
         # )
     else:
         print(f'Cloning typeshed to {TYPESHED_REPO_DIR}...')
+        # partial, sparse clone: only fetch and check out the stdlib files we actually read
         subprocess.run(
-            ['git', 'clone', '--depth=1', TYPESHED_REPO_URL, str(TYPESHED_REPO_DIR)],
+            ['git', 'clone', '--depth=1', '--filter=blob:none', '--sparse', TYPESHED_REPO_URL, str(TYPESHED_REPO_DIR)],
             check=True,
-            capture_output=True,
+            # discard output rather than buffering it; stderr is left attached so failures are still reported
+            stdout=subprocess.DEVNULL,
+        )
+        sparse_paths = [
+            '/stdlib/builtins.pyi',
+            *(f'/stdlib/{filename}' for filename in DEPENDENCY_FILES),
+            *(f'/stdlib/{dirname}/' for dirname in DEPENDENCY_DIRS),
+        ]
+        subprocess.run(
+            ['git', 'sparse-checkout', 'set', '--no-cone', *sparse_paths],
+            cwd=TYPESHED_REPO_DIR,
+            check=True,
+            stdout=subprocess.DEVNULL,
         )
 
     result = subprocess.run(
@@ -183,7 +212,23 @@ def clone_or_update_typeshed() -> tuple[Path, str]:
     return TYPESHED_REPO_DIR, commit
 
 
-def filter_statements(nodes: list[ast.stmt]) -> list[ast.stmt]:
+def _is_unchanged(filtered: list[ast.stmt], original: list[ast.stmt]) -> bool:
+    """Check whether filtering kept every statement of `original`, as the same node objects."""
+    return len(filtered) == len(original) and all(map(operator.is_, filtered, original))
+
+
+def filter_statements(
+    nodes: list[ast.stmt],
+    *,
+    # bound as defaults so the loop below reads them as locals rather than looking up globals and attributes;
+    # node classes are compared by identity rather than via isinstance
+    _FunctionDef: type[ast.FunctionDef] = ast.FunctionDef,
+    _AsyncFunctionDef: type[ast.AsyncFunctionDef] = ast.AsyncFunctionDef,
+    _ClassDef: type[ast.ClassDef] = ast.ClassDef,
+    _If: type[ast.If] = ast.If,
+    _allowed_functions: frozenset[str] = ALLOWED_FUNCTIONS,
+    _allowed_classes: frozenset[str] = ALLOWED_CLASSES,
+) -> list[ast.stmt]:
     """Filter a list of statements to keep only allowed functions and classes.
 
     Keeps:
@@ -192,6 +237,10 @@ def filter_statements(nodes: list[ast.stmt]) -> list[ast.stmt]:
     - Allowed function definitions
     - Allowed class definitions
 
+    Version conditionals like `if sys.version_info >= (3, 10):` are filtered too, using an explicit
+    stack rather than recursion; an if block is dropped if both branches are empty after filtering,
+    and returned as the original node if filtering didn't remove anything from it.
+
     Args:
         nodes: List of AST statement nodes.
 
@@ -199,114 +248,315 @@ def filter_statements(nodes: list[ast.stmt]) -> list[ast.stmt]:
         Filtered list of statements.
     """
     result: list[ast.stmt] = []
-    for node in nodes:
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            if node.name in ALLOWED_FUNCTIONS:
-                result.append(node)
-        elif isinstance(node, ast.ClassDef):
-            if node.name.startswith('_') or node.name in ALLOWED_CLASSES:
-                result.append(node)
-        elif isinstance(node, ast.If):
-            # Recursively filter version-conditional blocks
-            filtered = filter_if_block(node)
-            if filtered is not None:
-                result.append(filtered)
+    # each frame is (remaining statements, output list, (filtered, original) if nodes to finalize once exhausted)
+    stack: list[tuple[Iterator[ast.stmt], list[ast.stmt], tuple[ast.If, ast.If] | None]] = [(iter(nodes), result, None)]
+    while stack:
+        statements, out, pending_if = stack[-1]
+        append = out.append
+        for node in statements:
+            cls = node.__class__
+            # identity checks don't narrow types, hence the casts
+            if cls is _FunctionDef or cls is _AsyncFunctionDef:
+                if cast(ast.FunctionDef | ast.AsyncFunctionDef, node).name in _allowed_functions:
+                    append(node)
+            elif cls is _ClassDef:
+                name = cast(ast.ClassDef, node).name
+                if name[0] == '_' or name in _allowed_classes:
+                    append(node)
+            elif cls is _If:
+                if_node = cast(ast.If, node)
+                new_node = ast.copy_location(ast.If(test=if_node.test, body=[], orelse=[]), if_node)
+                append(new_node)
+                # the body frame goes on top so it's finished before the orelse frame finalizes new_node
+                stack.append((iter(if_node.orelse), new_node.orelse, (new_node, if_node)))
+                stack.append((iter(if_node.body), new_node.body, None))
+                break
+            else:
+                # Keep imports, type aliases, assignments, etc.
+                append(node)
         else:
-            # Keep imports, type aliases, assignments, etc.
-            result.append(node)
+            stack.pop()
+            if pending_if is not None:
+                # the parent frame is suspended on this if block, so it's always the last statement of its output
+                parent_out = stack[-1][1]
+                new_node, if_node = pending_if
+                if not new_node.body and not new_node.orelse:
+                    parent_out.pop()
+                elif _is_unchanged(new_node.body, if_node.body) and _is_unchanged(new_node.orelse, if_node.orelse):
+                    parent_out[-1] = if_node
+                elif not new_node.body:
+                    new_node.body.append(ast.Pass())
     return result
 
 
-def filter_if_block(node: ast.If) -> ast.If | None:
-    """Filter an if block, recursively filtering function and class definitions.
+@functools.cache
+def _filter_fingerprint() -> bytes:
+    """Hash everything other than the input that determines the filtered output.
+
+    That's the allow lists, plus this script's own source so that changes to the filtering logic
+    invalidate old cache entries.
+    """
+    h = hashlib.sha256()
+    h.update(repr(sorted(ALLOWED_FUNCTIONS)).encode())
+    h.update(repr(sorted(ALLOWED_CLASSES)).encode())
+    h.update(Path(__file__).read_bytes())
+    return h.digest()
+
+
+def _cache_key(source: bytes) -> str:
+    """Compute the cache key for filtering `source` with the current allow lists.
+
+    Args:
+        source: The raw source of builtins.pyi, or of a single if block from it.
 
-    Handles version conditionals like `if sys.version_info >= (3, 10):`.
+    Returns:
+        Hex digest identifying the filtered output.
+    """
+    return hashlib.sha256(_filter_fingerprint() + source).hexdigest()
+
+
+def _scan_top_level(source: bytes) -> list[tuple[str, str, int, int]]:
+    """Find top-level definitions and if blocks using the tokenizer, without building an AST.
 
     Args:
-        node: An ast.If node.
+        source: The source code to scan.
 
     Returns:
-        Filtered If node, or None if both branches are empty after filtering.
+        List of (kind, name, start_line, end_line) tuples, where kind is 'def', 'class' or 'if'
+        (with an empty name) and lines are 1-indexed and inclusive. start_line includes any
+        decorators, and for definitions any comment lines directly above them. end_line includes
+        indented comment lines following the statement, and an if block's span includes its elif
+        and else branches.
     """
-    filtered_body = filter_statements(node.body)
-    filtered_orelse = filter_statements(node.orelse)
-
-    # If both branches are empty, skip this if block entirely
-    if not filtered_body and not filtered_orelse:
-        return None
-
-    # Create a new If node with filtered contents
-    new_node = ast.If(
-        test=node.test,
-        body=filtered_body if filtered_body else [ast.Pass()],
-        orelse=filtered_orelse,
-    )
-    return ast.copy_location(new_node, node)
+    statements: list[tuple[str, str, int, int]] = []
+    # the statement currently being scanned, as (kind, name, start_line)
+    current: tuple[str, str, int] | None = None
+    decorator_start: int | None = None
+    # first line of the block of column 0 comments directly above the next statement
+    comment_start: int | None = None
+    depth = 0
+    # last line of the current statement, including indented comments after it
+    last_line = 0
+    at_statement_start = True
+
+    tokens = tokenize.tokenize(io.BytesIO(source).readline)
+    for tok in tokens:
+        tok_type = tok.type
+        if tok_type == tokenize.INDENT:
+            depth += 1
+        elif tok_type == tokenize.DEDENT:
+            depth -= 1
+        elif tok_type == tokenize.NEWLINE:
+            last_line = tok.start[0]
+            at_statement_start = True
+        elif tok_type == tokenize.ENDMARKER:
+            break
+        elif tok_type == tokenize.COMMENT:
+            # only comments on their own line matter, inline comments are covered by their statement's lines
+            if at_statement_start:
+                if tok.start[1] != 0:
+                    last_line = tok.start[0]
+                    comment_start = None
+                elif comment_start is None:
+                    comment_start = tok.start[0]
+        elif tok_type == tokenize.NL:
+            # a blank line detaches the comments above it from the next statement
+            if at_statement_start and not tok.line.strip():
+                comment_start = None
+        elif tok_type != tokenize.ENCODING and at_statement_start:
+            at_statement_start = False
+            if depth != 0:
+                comment_start = None
+                continue
+            if current is not None:
+                if current[0] == 'if' and tok.string in ('elif', 'else'):
+                    continue
+                kind, name, start = current
+                statements.append((kind, name, start, last_line))
+                current = None
+            if tok.string == '@':
+                # the span starts at the comments above the first decorator, comments after it can't move the start
+                if decorator_start is None:
+                    decorator_start = comment_start or tok.start[0]
+                comment_start = None
+                continue
+            if tok.string == 'async':
+                tok = next(tokens)
+            if tok.string in ('def', 'class'):
+                current = (tok.string, next(tokens).string, decorator_start or comment_start or tok.start[0])
+            elif tok.string == 'if':
+                current = ('if', '', tok.start[0])
+            decorator_start = None
+            comment_start = None
+
+    if current is not None:
+        kind, name, start = current
+        statements.append((kind, name, start, last_line))
+    return statements
+
+
+def _split_lines(source: str) -> list[str]:
+    """Split source into lines the same way the tokenizer and ast line numbers do.
+
+    Unlike `str.splitlines`, this only breaks on `\\n`, `\\r\\n` and `\\r`.
+    """
+    return io.StringIO(source, newline='').readlines()
 
 
-def filter_builtins(source: str) -> str:
+def _filter_if_block(block: str) -> str:
+    """Filter the source of a single top-level if block.
+
+    Args:
+        block: Source of the if block, including its elif and else branches.
+
+    Returns:
+        `block` itself if nothing was filtered out, an empty string if nothing was kept,
+        otherwise the unparsed filtered block.
+    """
+    if_block = ast.parse(block).body
+    kept = filter_statements(if_block)
+    if not kept:
+        return ''
+    elif kept[0] is if_block[0]:
+        return block
+    else:
+        return ast.unparse(kept[0]) + '\n'
+
+
+def filter_builtins(source: bytes) -> str:
     """Filter builtins.pyi to keep only allowed classes and functions.
 
-    This function parses the source with Python's ast module and filters
-    top-level definitions to only include those in the allow lists.
-    All imports and type definitions are preserved.
+    Top-level definitions are found with the tokenizer and filtered by name
+    against the allow lists; all imports and type definitions are preserved.
+
+    Rather than unparsing a whole tree, the source lines of rejected top-level
+    statements are elided, so kept code (and comments) are emitted verbatim.
+    Only version-conditional if blocks are parsed with Python's ast module,
+    each on its own, to filter their contents; those that lose statements are
+    rewritten with `ast.unparse`. This assumes each top-level statement has its own lines,
+    which holds for typeshed stubs.
+
+    The result is cached in CACHE_DIR, so re-running against an unchanged
+    upstream file skips parsing entirely. Filtered if blocks are cached too,
+    so after an upstream change only the if blocks that changed are parsed.
 
     Args:
-        source: The source code of builtins.pyi.
+        source: The raw UTF-8 source of builtins.pyi.
 
     Returns:
         Filtered source code.
     """
-    tree = ast.parse(source)
-    tree.body = filter_statements(tree.body)
-    ast.fix_missing_locations(tree)
-    return ast.unparse(tree)
+    cache_file = CACHE_DIR / f'{_cache_key(source)}.pyi'
+    if cache_file.exists():
+        print(f'Using cached filtered builtins from {cache_file}')
+        return cache_file.read_text()
+
+    if_cache_file = CACHE_DIR / 'if_blocks.json'
+    if_cache: dict[str, str] = json.loads(if_cache_file.read_text()) if if_cache_file.exists() else {}
+    # filtered if blocks from this run, which replace if_cache once we're done so stale entries don't pile up
+    if_blocks: dict[str, str] = {}
+
+    lines = _split_lines(source.decode())
+    removed = bytearray(len(lines))
+    # rewritten if blocks, keyed by the index of the first line they replace
+    replacements: dict[int, str] = {}
+    for kind, name, start, end in _scan_top_level(source):
+        if kind == 'if':
+            block = ''.join(lines[start - 1 : end])
+            key = _cache_key(block.encode())
+            filtered_block = if_cache.get(key)
+            if filtered_block is None:
+                filtered_block = _filter_if_block(block)
+            if_blocks[key] = filtered_block
+            if filtered_block == block:
+                continue
+            replacements[start - 1] = filtered_block
+        elif kind == 'def':
+            if name in ALLOWED_FUNCTIONS:
+                continue
+        elif name[0] == '_' or name in ALLOWED_CLASSES:
+            continue
+        removed[start - 1 : end] = b'\x01' * (end - start + 1)
+
+    filtered = ''.join(
+        replacements.get(i, '') if is_removed else line for i, (line, is_removed) in enumerate(zip(lines, removed))
+    )
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_file.write_text(filtered)
+    if_cache_file.write_text(json.dumps(if_blocks))
+    return filtered
 
 
 def copy_dependencies(src_stdlib: Path, dest_stdlib: Path) -> None:
     """Copy dependency modules from typeshed stdlib to vendor directory.
 
+    Files are copied individually on a thread pool, since the work is dominated by I/O.
+
     Args:
         src_stdlib: Path to the source stdlib directory in cloned typeshed.
         dest_stdlib: Path to the destination stdlib directory in vendor.
     """
-    # Copy individual files
-    for filename in DEPENDENCY_FILES:
-        src_file = src_stdlib / filename
-        if src_file.exists():
-            dest_file = dest_stdlib / filename
-            shutil.copy2(src_file, dest_file)
-            print(f'Copied {filename}')
-        else:
-            print(f'Warning: {filename} not found in typeshed')
-
-    # Copy directories recursively
-    for dirname in DEPENDENCY_DIRS:
-        src_dir = src_stdlib / dirname
-        if src_dir.exists():
-            dest_dir = dest_stdlib / dirname
-            if dest_dir.exists():
-                shutil.rmtree(dest_dir)
-            shutil.copytree(src_dir, dest_dir)
-            print(f'Copied {dirname}/')
-        else:
-            print(f'Warning: {dirname}/ not found in typeshed')
+    # pending copies for each file or directory, so we can report them once they're done
+    copies: dict[str, list[Future[object]]] = {}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # Copy individual files
+        for filename in DEPENDENCY_FILES:
+            src_file = src_stdlib / filename
+            if src_file.exists():
+                copies[filename] = [executor.submit(shutil.copy2, src_file, dest_stdlib / filename)]
+            else:
+                print(f'Warning: {filename} not found in typeshed')
+
+        # Copy directories recursively, creating the directory tree up front so files can be copied in parallel
+        for dirname in DEPENDENCY_DIRS:
+            src_dir = src_stdlib / dirname
+            if src_dir.exists():
+                dest_dir = dest_stdlib / dirname
+                if dest_dir.exists():
+                    shutil.rmtree(dest_dir)
+                futures: list[Future[object]] = []
+                for src_file in sorted(src_dir.rglob('*')):
+                    dest_file = dest_dir / src_file.relative_to(src_dir)
+                    if src_file.is_dir():
+                        dest_file.mkdir(parents=True, exist_ok=True)
+                    else:
+                        dest_file.parent.mkdir(parents=True, exist_ok=True)
+                        futures.append(executor.submit(shutil.copy2, src_file, dest_file))
+                copies[f'{dirname}/'] = futures
+            else:
+                print(f'Warning: {dirname}/ not found in typeshed')
+
+        for name, futures in copies.items():
+            for future in futures:
+                future.result()
+            print(f'Copied {name}')
 
 
 def main() -> int:
     """Main entry point."""
-    # Clean up any stale files from previous runs
-    if VENDOR_DIR.exists():
-        print(f'Removing existing {VENDOR_DIR}...')
-        shutil.rmtree(VENDOR_DIR)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Clean up any stale files from previous runs and find custom stubs while typeshed is cloned,
+        # none of them touch the typeshed repo
+        if VENDOR_DIR.exists():
+            print(f'Removing existing {VENDOR_DIR}...')
+            remove_vendor = executor.submit(shutil.rmtree, VENDOR_DIR)
+        else:
+            remove_vendor = None
+        find_custom_files = executor.submit(lambda: sorted(CUSTOM_DIR.glob('*.pyi')))
+
+        # Clone or update typeshed
+        repo_path, commit = clone_or_update_typeshed()
+        print(f'At commit {commit}')
 
-    # Clone or update typeshed
-    repo_path, commit = clone_or_update_typeshed()
-    print(f'At commit {commit}')
+        if remove_vendor is not None:
+            remove_vendor.result()
+        custom_files = find_custom_files.result()
 
     # Read source file
     builtins_path = repo_path / 'stdlib' / 'builtins.pyi'
-    source = builtins_path.read_text()
+    # read bytes directly: they're hashed for the cache key and tokenized before anything is decoded
+    source = builtins_path.read_bytes()
     print(f'Read {len(source)} bytes from builtins.pyi')
 
     # Filter
@@ -325,7 +575,7 @@ def main() -> int:
     copy_dependencies(src_stdlib, STDLIB_DIR)
 
     # copy pyi files from CUSTOM_DIR into STDLIB_DIR
-    for file in CUSTOM_DIR.glob('*.pyi'):
+    for file in custom_files:
         shutil.copy2(file, STDLIB_DIR)
 
     (VENDOR_DIR / 'source_commit.txt').write_text(commit + '\n')
@@ -3,5 +3,5 @@
 import sys
 
 # === Verify type() returns _io.TextIOWrapper for stdout/stderr ===
-assert str(type(sys.stdout)) == "<class '_io.TextIOWrapper'>", 'type(stdout) is _io.TextIOWrapper'
-assert str(type(sys.stderr)) == "<class '_io.TextIOWrapper'>", 'type(stderr) is _io.TextIOWrapper'
+expected = "<class '_io.TextIOWrapper'>"
+assert str(type(sys.stdout)) == expected == str(type(sys.stderr)), 'type(stdout) and type(stderr) are _io.TextIOWrapper'